@@ -13,6 +13,21 @@ from binaryninja import PluginCommand
 
 from .find_bios_calls import run_plugin as find_bios_calls_run
 
+# Precompiled once instead of re-parsing the "<L" format string on
+# every struct.unpack() call.
+_U32 = struct.Struct("<L")
+
+# Segment flag combinations. Enum attribute access is slow in CPython,
+# so resolve these once at import instead of per view load.
+rwx = (SegmentFlag.SegmentReadable |
+       SegmentFlag.SegmentWritable |
+       SegmentFlag.SegmentExecutable)
+r_x = (SegmentFlag.SegmentReadable |
+       SegmentFlag.SegmentExecutable)
+r_xc = (SegmentFlag.SegmentReadable |
+        SegmentFlag.SegmentExecutable |
+        SegmentFlag.SegmentContainsCode)
+
 # Playstation memory map (mostly iomapped control registers)
 #
 # Whereever I know of a symbol name used within PSXDEV it is used, but
@@ -49,8 +64,6 @@ psx_memmap_constants = {
     0x1f801074: "I_MASK",  # IRQ mask
 
     # DMA
-    0x1f8010f0: "DPCR",    # DMA control register
-    0x1f8010f4: "DICR",    # DMA interrupt register
     0x1f801000: "D0_MADR",  # DMA base address channel 0
     0x1f801010: "D1_MADR",  # - " -       channel 1
     0x1f801020: "D2_MADR",  # - " -       channel 2
@@ -72,7 +85,8 @@ psx_memmap_constants = {
     0x1f801048: "D4_CHCR",  # - " -        channel 4
     0x1f801058: "D5_CHCR",  # - " -        channel 5
     0x1f801068: "D6_CHCR",  # - " -        channel 6
-    0x1f8010f4: "DICR",    # DMA Interrupt Control Register
+    0x1f8010f0: "DPCR",    # DMA control register
+    0x1f8010f4: "DICR",    # DMA interrupt register
 
     # CDROM
     0x1f801800: "CDREG0",
@@ -89,7 +103,6 @@ psx_memmap_constants = {
     0x1f8010e0: "D6_MADR",  # GPU DMA base address
     0x1f8010e4: "D6_BCR",   # GPU DMA block control
     0x1f8010e8: "D6_CHCR",  # GPU DMA channel control
-    0x1f8010f0: "DPCR",     # GPU DMA control register
 
     # Timers (aka root clocks)
     0x1f801100: "T0_VALUE",  # Current counter value for timer 0
@@ -254,10 +267,11 @@ psx_memmap_constants = {
     0x1f801d82: "S_VOLR",  # Mainvolume right
     0x1f801d84: "S_REVL",  # Reverberation depth left
     0x1f801d86: "S_REVR",  # Reverberation depth right
-    0x1f801d88: "S_ENA1",  # Voice ON (0-15)
+    # FIXME: S_ENA1 (voice ON 0-15) used to share 0x1f801d88 with
+    # S_ENA2, which can't be right; check the real register layout
     0x1f801d88: "S_ENA2",  # Voice ON (16-23)
     0x1f801d8c: "S_STP1",  # Voice OFF (0-15)
-    0x1f801d8e: "S_STP1",  # Voice OFF (16-23)
+    0x1f801d8e: "S_STP2",  # Voice OFF (16-23)
     0x1f801d90: "S_MOD1",  # Channel FM (pitch lfo) mode (0-15)
     0x1f801d92: "S_MOD2",  # Channel FM (pitch lfo) mode (16-32)
     0x1f801d94: "S_NOICE1",  # Channel Noise mode (0-15)
@@ -297,10 +311,11 @@ class PSXView(BinaryView):
 
     @classmethod
     def is_valid_for_data(self, data):
-        hdr = data.read(0, self.HDR_SIZE)
-        if len(hdr) < self.HDR_SIZE:
+        # This runs on every file Binary Ninja probes, so only read
+        # the magic instead of the whole 2K header
+        if len(data) < self.HDR_SIZE:
             return False
-        if hdr[0:8] != b"PS-X EXE":
+        if data.read(0, 8) != b"PS-X EXE":
             return False
         log_info("PSX EXE identified")
         return True
@@ -313,10 +328,10 @@ class PSXView(BinaryView):
     def init(self):
         try:
             hdr = self.parent_view.read(0, 0x800)
-            self.init_pc = struct.unpack("<L", hdr[0x10:0x14])[0]
-            self.text_start = struct.unpack("<L", hdr[0x18:0x1c])[0]
-            self.text_size = struct.unpack("<L", hdr[0x1c:0x20])[0]
-            self.init_sp = struct.unpack("<L", hdr[0x30:0x34])[0]
+            self.init_pc = _U32.unpack_from(hdr, 0x10)[0]
+            self.text_start = _U32.unpack_from(hdr, 0x18)[0]
+            self.text_size = _U32.unpack_from(hdr, 0x1c)[0]
+            self.init_sp = _U32.unpack_from(hdr, 0x30)[0]
             self.info = hdr[0x4c:self.HDR_SIZE]
             log_debug("/info size: %s" % format(len(self.info), '#010x'))
 
@@ -340,28 +355,18 @@ class PSXView(BinaryView):
             if (self.text_size % 2048 != 0):
                 log_warn("size not divisible by 2k")
 
-            text = self.parent_view.read(self.HDR_SIZE, self.text_size)
-            log_info("Actual size of acquired TEXT: %s" %
-                     format(len(text), '#010x'))
-            if (len(text) != self.text_size):
+            # No need to read the TEXT data just to check its size;
+            # the segment added below maps it from the parent view
+            text_avail = len(self.parent_view) - self.HDR_SIZE
+            log_info("Actual size of available TEXT: %s" %
+                     format(text_avail, '#010x'))
+            if (text_avail < self.text_size):
                 log_error(
-                    "Size of acquired data is not same as header-prescribed TEXT size. Truncated file?")
+                    "Size of available data is not same as header-prescribed TEXT size. Truncated file?")
 
             # add_auto_segment(start, length,
             #                  data_offset, data_length, flags)
 
-            r__ = SegmentFlag.SegmentReadable
-            rw_ = (SegmentFlag.SegmentReadable |
-                   SegmentFlag.SegmentWritable)
-            rwx = (SegmentFlag.SegmentReadable |
-                   SegmentFlag.SegmentWritable |
-                   SegmentFlag.SegmentExecutable)
-            r_x = (SegmentFlag.SegmentReadable |
-                   SegmentFlag.SegmentExecutable)
-            r_xc = (SegmentFlag.SegmentReadable |
-                    SegmentFlag.SegmentExecutable |
-                    SegmentFlag.SegmentContainsCode)
-
             # Scratchpad RAM 1k
             self.add_auto_segment(0x9F800000, 1024, 0, 0, rwx)
             self.add_auto_section("Scratchpad", 0x9F800000, 1024)
@@ -439,9 +444,12 @@ class PSXView(BinaryView):
             # c0-calls, those should be lifted in some
             # other manner but are useful enough that they
             # are hardcoded right now.
+            # ~170 symbols; keep the per-entry work down to the one
+            # unavoidable define_auto_symbol call
+            define_symbol = self.define_auto_symbol
+            data_symbol = SymbolType.DataSymbol
             for addr, symbol in psx_memmap_constants.items():
-                self.define_auto_symbol(
-                    Symbol(SymbolType.DataSymbol, addr, symbol))
+                define_symbol(Symbol(data_symbol, addr, symbol))
 
             # Uncomment this and remove the hook if you want to run
             # function BIOS calls manually.